@@ -1,7 +1,7 @@
 from utils import tryCatchHandler, responder, validateQueryParam, getRandomImageChunk, weightedRandomChoice, getImageFromS3, extractContentType, extractBucketInfo
 from config import ALLOWED_LABELS, HTTP
 from typing import Any, Dict
-import base64
+import pybase64
 
 @tryCatchHandler
 def lambda_handler(evt: Dict[str, Any], _ctx: Any) -> Dict[str, Any]:
@@ -32,5 +32,5 @@ def lambda_handler(evt: Dict[str, Any], _ctx: Any) -> Dict[str, Any]:
         "headers": {
             "Content-Type": extractContentType(key=bucketKey)
         },
-        "body": base64.b64encode(imageBytes).decode("utf-8")  
+        "body": pybase64.b64encode(imageBytes).decode("ascii")  
     }
\ No newline at end of file
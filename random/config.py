@@ -1,5 +1,5 @@
 import logging
-from botoClients import ssm
+from botoClients import getSSMParam  # cached SSM lookups, re-exported as cfg.getSSMParam
 
 """
 ================= CONSTANTS =================
@@ -13,27 +13,23 @@ class HTTP:
     NOT_FOUND = 404
     INTERNAL_ERROR = 500
 
-ALLOWED_LABELS = {"cat", "dog"}
+ALLOWED_LABELS = frozenset({"cat", "dog"})
+CHUNK_COUNT_TTL = 60  # seconds
+CHUNK_CONTENT_TTL = 60  # seconds
+CHUNK_CONTENT_CACHE_SIZE = 64  # chunks kept per container (LRU), bounds memory on long-lived containers
+CHUNK_DRAW_ATTEMPTS = 3  # random chunk draws before reporting no images (skips empty chunks)
+S3_READ_CHUNK_SIZE = 3 * 64 * 1024  # 192KB, multiple of 3 to keep base64 alignment
+S3_RANGE_PART_SIZE = 1_500_000  # bytes per ranged GET; larger objects are fetched in parallel parts
+EXTENSION_MIMES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp"
+}
 
 """
 ================= Logging =================
 """
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-"""
-================= SSM Helpers =================
-"""
-
-_paramCache = {}
-def getSSMParam(paramName: str, default: str = None, decrypt: bool = False):
-    if paramName in _paramCache:
-        return _paramCache[paramName]
-    
-    try:
-        responseValue = ssm.get_parameter(Name=paramName, WithDecryption=decrypt)["Parameter"]["Value"]
-        _paramCache[paramName] = responseValue 
-        return responseValue
-    except Exception as _e:
-        return default
\ No newline at end of file
+logger.setLevel(logging.INFO)
\ No newline at end of file
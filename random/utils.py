@@ -1,10 +1,25 @@
 from typing import Any, Callable, Dict, List, Union
-from boto3.dynamodb.conditions import Key
-from botoClients import dynamodb, s3
-from decimal import Decimal
-import json, random, os
+from botoClients import dynamodb, dynamodbClient, s3
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate
+from collections import OrderedDict
+import orjson, random, os, time
 import config as cfg
 
+# table setups, resolved once per container (warm invocations reuse them)
+_INFO_TABLE = dynamodb.Table(cfg.getSSMParam(paramName="/pet-api/production/dynamoDB/chunk-info-table-name", default=os.environ.get("fb_chunkInfoTableName")))
+_CHUNK_TABLE_NAME = cfg.getSSMParam(paramName="/pet-api/production/dynamoDB/image-chunks-table-name", default=os.environ.get("fb_chunkImageTableName"))
+
+# label -> (chunksNumber, fetched-at timestamp)
+_chunkCountCache: dict[str, tuple[int, float]] = {}
+_chunkCountRefreshing: set[str] = set()
+# (label, chunkNumber) -> (chunk items, fetched-at timestamp), LRU-bounded by cfg.CHUNK_CONTENT_CACHE_SIZE
+_chunkContentCache: OrderedDict[tuple[str, int], tuple[list[dict], float]] = OrderedDict()
+
+# background workers, reused across warm invocations
+_executor = ThreadPoolExecutor(max_workers=4)
+
 def responder(statusCode: int, bodyMessage: Dict[str, Any]) -> Dict[str, Any]:
     """
     Constructs a standardized HTTP response for API Gateway.
@@ -24,9 +39,13 @@ def responder(statusCode: int, bodyMessage: Dict[str, Any]) -> Dict[str, Any]:
         "headers": {
             "Content-Type": "application/json"
         },
-        "body": json.dumps(bodyMessage)
+        "body": orjson.dumps(bodyMessage, default=str).decode("utf-8")
     }
 
+# canonical error responses, serialized once (never mutated by callers)
+_BAD_REQUEST_RESPONSE = responder(400, {"error": "Bad request"})
+_INTERNAL_ERROR_RESPONSE = responder(500, {"error": "Internal server error"})
+
 def tryCatchHandler(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
     """
     A decorator to wrap Lambda handler functions with standardized exception handling.
@@ -53,11 +72,11 @@ def tryCatchHandler(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[s
         except ValueError as ve:
             # client-side errors
             cfg.logger.warning(f"ValueError: {ve}")
-            return responder(400, {"error": "Bad request"})
+            return _BAD_REQUEST_RESPONSE
         except Exception as ge:
             # internal error 
             cfg.logger.error(f"Unhandled Exception: {ge}", exc_info=True)
-            return responder(500, {"error": "Internal server error"})
+            return _INTERNAL_ERROR_RESPONSE
     return wrapper
 
 def validateQueryParam(qp: dict[str, str]) -> bool:
@@ -72,62 +91,164 @@ def validateQueryParam(qp: dict[str, str]) -> bool:
         bool: True if the query parameters are valid (only 'label' key and allowed value),
               False otherwise.
     """
-    return (
-        bool(qp) and
-        len(qp) == 1 and
-        qp.get("label") in cfg.ALLOWED_LABELS
-    )
+    return isinstance(qp, dict) and len(qp) == 1 and qp.get("label") in cfg.ALLOWED_LABELS
     
-def getRandomImageChunk(label: str) -> List[Dict[str, Union[str, Decimal]]]:
+def _fetchChunksNumber(label: str) -> int:
     """
-    Retrieves a random chunk of image metadata for a given label from DynamoDB.
-
-    This function:
-        - Fetches the total number of chunks for the specified label.
-        - Randomly selects one chunk index within the valid range.
-        - Queries the image chunk table to return all image entries from that chunk.
+    Reads the number of chunks for a given label from DynamoDB and refreshes the cache entry.
 
     Args:
         label (str): The label/category of the images (e.g., "cat", "dog").
 
     Returns:
-        List[Dict[str, Union[str, Decimal]]]: A list of image metadata dictionaries,
-            each containing 's3key' and 'weight'. Returns an empty list if no chunks exist.
+        int: The number of chunks stored for the label.
 
     Raises:
-        RuntimeError: If any DynamoDB operation fails (fetching metadata or querying images).
+        RuntimeError: If the chunk metadata cannot be retrieved from DynamoDB.
     """
-    # table setups
-    infoTableName = cfg.getSSMParam(paramName="/pet-api/production/dynamoDB/chunk-info-table-name", default=os.environ.get("fb_chunkInfoTableName"))
-    infoTable = dynamodb.Table(infoTableName)
-    chunkTableName = cfg.getSSMParam(paramName="/pet-api/production/dynamoDB/image-chunks-table-name", default=os.environ.get("fb_chunkImageTableName"))
-    chunkTable = dynamodb.Table(chunkTableName)
-
-    # get chunk metadata within a given label
     try:
-        responseMetadata = infoTable.get_item(Key={"label": label})["Item"]
+        responseMetadata = _INFO_TABLE.get_item(Key={"label": label})["Item"]
         chunksNumber = int(responseMetadata["chunksNumber"])
     except Exception as _e:
         raise RuntimeError("Failed to retrieve chunk metadata from DynamoDB")
 
-    # edge case: no image/chunk exists
-    if chunksNumber == 0:
-        return []
-    
-    # take a random chunk index in [0, chunksNumber) 
-    randomChunkIDX = random.randint(0, chunksNumber - 1)
+    if chunksNumber > 0:
+        _chunkCountCache[label] = (chunksNumber, time.time())
+    return chunksNumber
 
-    # get images within a given random chunk
+def _refreshChunksNumber(label: str) -> None:
+    """
+    Background variant of `_fetchChunksNumber`; failures are logged and the stale entry is kept.
+    """
     try:
-        response = chunkTable.query(
+        _fetchChunksNumber(label=label)
+    except Exception as e:
+        cfg.logger.warning(f"Chunk count refresh failed for label '{label}': {e}")
+    finally:
+        _chunkCountRefreshing.discard(label)
+
+def getChunksNumber(label: str) -> int:
+    """
+    Returns the number of chunks for a given label, cached per container for `cfg.CHUNK_COUNT_TTL` seconds.
+
+    Chunks are only ever appended by the upload function (a rolled-back upload leaves its chunk
+    behind, empty), so a stale count can only lag behind; empty draws are retried by `getRandomImageChunk`.
+    An expired entry is still returned right away while a refresh runs in the background, which
+    overlaps the `GetItem` with the chunk query instead of serializing them. Empty labels are not
+    cached so that the first upload becomes visible immediately.
+
+    Args:
+        label (str): The label/category of the images (e.g., "cat", "dog").
+
+    Returns:
+        int: The number of chunks stored for the label.
+
+    Raises:
+        RuntimeError: If the chunk metadata cannot be retrieved from DynamoDB (cache miss only).
+    """
+    cached = _chunkCountCache.get(label)
+    if not cached:
+        return _fetchChunksNumber(label=label)
+
+    if time.time() - cached[1] >= cfg.CHUNK_COUNT_TTL and label not in _chunkCountRefreshing:
+        _chunkCountRefreshing.add(label)
+        _executor.submit(_refreshChunksNumber, label)
+    return cached[0]
+
+def _getImageChunk(label: str, chunkIDX: int) -> List[Dict[str, Union[str, float]]]:
+    """
+    Returns the image entries of one chunk, reusing the per-container copy for `cfg.CHUNK_CONTENT_TTL` seconds.
+
+    At most `cfg.CHUNK_CONTENT_CACHE_SIZE` chunks are kept, least recently used first out.
+
+    Raises:
+        RuntimeError: If the image chunk query fails.
+    """
+    cacheKey = (label, chunkIDX)
+    cached = _chunkContentCache.get(cacheKey)
+    if cached and time.time() - cached[1] < cfg.CHUNK_CONTENT_TTL:
+        _chunkContentCache.move_to_end(cacheKey)
+        return cached[0]
+
+    # get images within the given chunk
+    try:
+        response = dynamodbClient.query(
+            TableName=_CHUNK_TABLE_NAME,
             IndexName="LabelChunkIndex",
-            KeyConditionExpression=Key("label").eq(label) & Key("chunkNumber").eq(Decimal(randomChunkIDX)),
+            KeyConditionExpression="#label = :label AND chunkNumber = :chunkNumber",
+            ExpressionAttributeNames={"#label": "label"},
+            ExpressionAttributeValues={
+                ":label": {"S": label},
+                ":chunkNumber": {"N": str(chunkIDX)}
+            },
             ProjectionExpression="s3key, weight"
         )
-        return response.get("Items", [])
+        rawItems = response.get("Items", [])
     except Exception as _e:
         raise RuntimeError("Failed to retrieve images from image-chunks table")
 
+    # unwrap typed attributes, weights straight to float so selection runs on plain floats
+    items = []
+    distinctWeights = set()
+    for rawItem in rawItems:
+        weight = float(rawItem["weight"]["N"])
+        items.append({"s3key": rawItem["s3key"]["S"], "weight": weight})
+        distinctWeights.add(weight)
+
+    # equal weights (e.g. all default 0.5) degrade to a uniform pick
+    if len(distinctWeights) == 1:
+        for item in items:
+            item["_uniform"] = True
+
+    # an empty chunk may still be mid-upload, don't pin it
+    if items:
+        _chunkContentCache[cacheKey] = (items, time.time())
+        _chunkContentCache.move_to_end(cacheKey)
+        # evict least recently used chunks so memory stays bounded on long-lived containers
+        while len(_chunkContentCache) > cfg.CHUNK_CONTENT_CACHE_SIZE:
+            _chunkContentCache.popitem(last=False)
+    else:
+        _chunkContentCache.pop(cacheKey, None)
+    return items
+
+def getRandomImageChunk(label: str) -> List[Dict[str, Union[str, float]]]:
+    """
+    Retrieves a random chunk of image metadata for a given label from DynamoDB.
+
+    This function:
+        - Fetches the total number of chunks for the specified label (cached, see `getChunksNumber`).
+        - Randomly selects one chunk index within the valid range.
+        - Returns all image entries from that chunk (cached, see `_getImageChunk`).
+
+    A chunk can be empty while its first upload is in flight (or after that upload was rolled back),
+    so an empty draw moves on to another (distinct) random index, up to `cfg.CHUNK_DRAW_ATTEMPTS` chunks.
+
+    Args:
+        label (str): The label/category of the images (e.g., "cat", "dog").
+
+    Returns:
+        List[Dict[str, Union[str, float]]]: A list of image metadata dictionaries,
+            each containing 's3key' and 'weight' (as float), plus
+            '_uniform' = True when every weight in the chunk is equal.
+            Returns an empty list if no chunks (or only empty chunks) exist.
+
+    Raises:
+        RuntimeError: If any DynamoDB operation fails (fetching metadata or querying images).
+    """
+    # get chunk metadata within a given label
+    chunksNumber = getChunksNumber(label=label)
+
+    # edge case: no image/chunk exists
+    if chunksNumber == 0:
+        return []
+
+    # take distinct random chunk indices in [0, chunksNumber), moving on when one turns out empty
+    for randomChunkIDX in random.sample(range(chunksNumber), min(cfg.CHUNK_DRAW_ATTEMPTS, chunksNumber)):
+        items = _getImageChunk(label=label, chunkIDX=randomChunkIDX)
+        if items:
+            return items
+    return []
+
 def weightedRandomChoice(imageList: list[dict]) -> str:
     """
     Selects an image's S3 key from a list of image metadata using weighted random selection.
@@ -138,44 +259,109 @@ def weightedRandomChoice(imageList: list[dict]) -> str:
     Args:
         imageList (list[dict]): A list of dictionaries, each containing at least:
             - 's3key' (str): The S3 key for the image.
-            - 'weight' (Decimal): The selection weight.
+            - 'weight' (float): The selection weight.
+            - '_uniform' (bool, optional): Set on chunks whose weights are all equal, selects uniformly.
 
     Returns:
         str: The 's3key' of the selected image.
     """
-    totalWeight = sum(Decimal(item["weight"]) for item in imageList)
-    rand = totalWeight * Decimal(str(random.random()))
-    
-    for item in imageList:
-        rand -= item["weight"]
-        if rand < 0:
-            return item["s3key"]
-    # fallback
-    return imageList[-1]["s3key"] 
+    if imageList[0].get("_uniform"):
+        return imageList[random.randrange(len(imageList))]["s3key"]
 
-def getImageFromS3(bucketName: str, bucketKey: str) -> bytes:
+    # one pass to build cumulative weights; random.choices then only bisects
+    cumWeights = list(accumulate(item["weight"] for item in imageList))
+    return random.choices(imageList, cum_weights=cumWeights)[0]["s3key"]
+
+def _readBodyInto(body: Any, bufferView: memoryview) -> int:
+    """
+    Streams an S3 `StreamingBody` into the given buffer view in `cfg.S3_READ_CHUNK_SIZE` chunks.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    offset = 0
+    for chunk in body.iter_chunks(chunk_size=cfg.S3_READ_CHUNK_SIZE):
+        bufferView[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return offset
+
+def _getRangeInto(bucketName: str, bucketKey: str, start: int, end: int, bufferView: memoryview, etag: str) -> int:
+    """
+    Fetches the byte range [start, end) of an S3 object into the matching slice of `bufferView`.
+
+    The GET is pinned to `etag` (`IfMatch`), so a concurrent overwrite fails the read instead of
+    stitching parts of two object versions together.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    body = s3.get_object(
+        Bucket=bucketName,
+        Key=bucketKey,
+        Range=f"bytes={start}-{end - 1}",
+        IfMatch=etag
+    )["Body"]
+    return _readBodyInto(body=body, bufferView=bufferView[start:end])
+
+def getImageFromS3(bucketName: str, bucketKey: str) -> bytearray:
     """
     Retrieves binary image data from an S3 bucket using the provided bucket name and key.
 
+    The first `cfg.S3_RANGE_PART_SIZE` bytes are requested with a ranged GET, whose `ContentRange`
+    reveals the object size. Objects that fit in that part need no further request; for larger ones
+    the remaining ranges are fetched concurrently (one connection each), pinned to the first part's
+    ETag. All parts are streamed into a single preallocated buffer, so the full payload is held in
+    memory only once. A zero-byte object (416 `InvalidRange` on the first part) yields an empty buffer.
+
     Args:
         bucketName (str): The name of the S3 bucket.
         bucketKey (str): The key (path) to the image object in the bucket.
 
     Returns:
-        bytes: The binary content of the image.
+        bytearray: The binary content of the image.
+
+    Raises:
+        RuntimeError: If fewer bytes than the object size were received.
     """
-    return s3.get_object(
-        Bucket=bucketName,
-        Key=bucketKey
-    )["Body"].read()
+    partSize = cfg.S3_RANGE_PART_SIZE
+    try:
+        firstPart = s3.get_object(
+            Bucket=bucketName,
+            Key=bucketKey,
+            Range=f"bytes=0-{partSize - 1}"
+        )
+    except ClientError as e:
+        # a zero-byte object has no satisfiable range
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            return bytearray()
+        raise
+    # ContentRange = "bytes 0-<end>/<total>"
+    contentRange = firstPart.get("ContentRange")
+    totalSize = int(contentRange.rsplit("/", 1)[1]) if contentRange else int(firstPart["ContentLength"])
+
+    imageBuffer = bytearray(totalSize)
+    bufferView = memoryview(imageBuffer)
+
+    # remaining parts in parallel, while this thread drains the first one
+    rangeFutures = [
+        _executor.submit(_getRangeInto, bucketName, bucketKey, start, min(start + partSize, totalSize), bufferView, firstPart["ETag"])
+        for start in range(partSize, totalSize, partSize)
+    ]
+    received = _readBodyInto(body=firstPart["Body"], bufferView=bufferView[:min(partSize, totalSize)])
+    received += sum(future.result() for future in rangeFutures)
+
+    if received != totalSize:
+        raise RuntimeError("Incomplete image read from S3")
+    return imageBuffer
 
 
 def extractBucketInfo(s3Key: str) -> tuple[str, str]:
     """
     Extracts the bucket name and object key from a full S3 URL.
 
-    Assumes the format of the S3 URL is:
-    https://<bucket-name>.s3.amazonaws.com/<object-key>
+    Supports both virtual-hosted and path-style URLs, on the global or regional endpoints:
+    https://<bucket-name>.s3[.<region>].amazonaws.com/<object-key>
+    https://s3[.<region>].amazonaws.com/<bucket-name>/<object-key>
 
     Args:
         s3Key (str): The full S3 URL.
@@ -184,11 +370,31 @@ def extractBucketInfo(s3Key: str) -> tuple[str, str]:
         tuple[str, str]: A tuple containing:
             - bucketName (str): The name of the S3 bucket.
             - bucketKey (str): The path/key of the object in the bucket.
+
+    Raises:
+        RuntimeError: If the URL does not match a known S3 format.
     """
-    # remove "https://" prefix
-    removedHttpsPrefix = s3Key[8:]  
-    
-    bucketName, bucketKey = removedHttpsPrefix.split(".s3.amazonaws.com/")
+    # object keys are stored unquoted, so split on raw separators rather than URL-parsing ('?'/'#' may be part of the key)
+    _scheme, _, removedPrefix = s3Key.partition("://")
+    host, _, path = removedPrefix.partition("/")
+
+    # virtual-hosted: bucket is everything before the ".s3." / ".s3-" endpoint label
+    # (checked first, bucket names may themselves start with "s3-" / "s3.")
+    endpointIDX = host.rfind(".s3.")
+    if endpointIDX == -1:
+        endpointIDX = host.rfind(".s3-")
+
+    if endpointIDX > 0:
+        bucketName = host[:endpointIDX]
+        bucketKey = path
+    elif host.startswith(("s3.", "s3-")):
+        # path-style: the host is the endpoint itself, bucket is the first path segment
+        bucketName, _, bucketKey = path.partition("/")
+    else:
+        bucketName = bucketKey = ""
+
+    if not bucketName or not bucketKey or not host.endswith(".amazonaws.com"):
+        raise RuntimeError("Unrecognized S3 URL format")
     return (bucketName, bucketKey)
 
 
@@ -202,11 +408,5 @@ def extractContentType(key: str) -> str:
     Returns:
         str: The appropriate MIME type string for HTTP response headers.
     """
-    if key.endswith(".jpg") or key.endswith(".jpeg"):
-        return "image/jpeg"
-    elif key.endswith(".png"):
-        return "image/png"
-    elif key.endswith(".webp"):
-        return "image/webp"
-    else: # fallback
-        return "application/octet-stream"  
\ No newline at end of file
+    # fallback for unknown extensions
+    return cfg.EXTENSION_MIMES.get(os.path.splitext(key)[1].lower(), "application/octet-stream")
\ No newline at end of file
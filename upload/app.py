@@ -1,30 +1,32 @@
-from utils import responder, tryCatchHandler, bodyParser, bodyValidator, getChunksInfo, selectAndModifyChunk, s3Upload, appendToChunkFile, s3Delete
-import json, base64
+from utils import responder, tryCatchHandler, bodyParser, bodyValidator, uploadAndIndex, INVALID_MULTIPART_RESPONSE
+import json, pybase64
 from decimal import Decimal
-from config import HTTP
+from config import HTTP, MAX_REQUEST_SIZE
 from typing import Dict, Any
 
 @tryCatchHandler
 def lambda_handler(evt: Dict[str, Any], _ctx: Any) -> Dict[str, Any]:
-    # Decode the base64-encoded request body
+    # decode the request body only when API Gateway base64-encoded it (binary media types)
+    rawBody = evt.get("body") or b""
     try:
-        decodedBody = base64.b64decode(evt.get("body", b""))
+        if evt.get("isBase64Encoded", False):
+            decodedBody = pybase64.b64decode(rawBody, validate=True)
+        else:
+            decodedBody = rawBody.encode("utf-8") if isinstance(rawBody, str) else rawBody
     except Exception:
-        return responder(HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+        return INVALID_MULTIPART_RESPONSE
     
     # validate and parse request body
     if not decodedBody:
-        return responder(HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+        return INVALID_MULTIPART_RESPONSE
+
+    # reject oversized bodies before spending any parsing work on them
+    if len(decodedBody) > MAX_REQUEST_SIZE:
+        return responder(HTTP.PAYLOAD_TOO_LARGE, {"error": "payload too large"})
     
     parsedBodyResult = bodyParser(requestBody=decodedBody, requestHeader=evt.get("headers", {}))
     if "error" in parsedBodyResult:
-        return responder(HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+        return INVALID_MULTIPART_RESPONSE
 
     validatorResult = bodyValidator(req_body=parsedBodyResult)
     if validatorResult is not True:
@@ -34,35 +36,15 @@ def lambda_handler(evt: Dict[str, Any], _ctx: Any) -> Dict[str, Any]:
     labelValue = parsedBodyResult.get("label").get("value")
     weightValue = parsedBodyResult.get("weight", {}).get("value")
 
-    # make/attempt-to upload to S3
-    s3Key = s3Upload(
+    # upload to S3 and register in a chunk (concurrently, rolled back on failure)
+    requestWeight = Decimal(str(weightValue)) if weightValue is not None else Decimal("0.5")
+    s3Url = uploadAndIndex(
         fileDict=requestFile,
         label=labelValue,
+        weight=requestWeight
     )
 
-    if not s3Key:
-        return responder(HTTP.INTERNAL_ERROR, {
-                "error": "Failure to upload the image, please try again."
-            })
-
-    try:
-        # fetch and confirm chunk info from dynamoDB
-        chunksInfoJson = getChunksInfo(label=labelValue)
-        selectedChunkID = selectAndModifyChunk(chunkMetadata=chunksInfoJson, label=labelValue)
-
-        requestWeight = Decimal(str(weightValue)) if weightValue is not None else Decimal("0.5")
-        appendToChunkFile(                     
-            label=labelValue,
-            chunkId=selectedChunkID,
-            newEntry={
-                "s3key": s3Key,
-                "weight": requestWeight
-            }
-        )
-
-    except Exception as _e:
-        # metadata insertion failed, delete uploaded image from S3
-        s3Delete(s3Key=s3Key)
+    if not s3Url:
         return responder(HTTP.INTERNAL_ERROR, {
                 "error": "Failure to upload the image, please try again."
             })
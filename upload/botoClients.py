@@ -1,5 +1,32 @@
+import functools
 import boto3
+from botocore.config import Config
 
-s3 = boto3.client("s3")
-ssm = boto3.client("ssm")
-dynamodb = boto3.resource("dynamodb")
\ No newline at end of file
+# one explicit session for every client (sessions are not thread-safe, clients are),
+# created at import so worker threads only ever touch ready clients
+_session = boto3.session.Session()
+
+# reuse pooled keep-alive connections across warm invocations
+_clientConfig = Config(
+    max_pool_connections=20,
+    tcp_keepalive=True,
+    retries={"max_attempts": 2, "mode": "standard"}
+)
+
+s3 = _session.client("s3", config=_clientConfig)
+# SSM is only hit during init (values are cached), keep its timeouts short so an unreachable
+# endpoint falls back to the env values well within the function timeout
+ssm = _session.client("ssm", config=_clientConfig.merge(Config(connect_timeout=1, read_timeout=1)))
+dynamodb = _session.resource("dynamodb", config=_clientConfig)
+dynamodbClient = _session.client("dynamodb", config=_clientConfig)
+
+@functools.lru_cache(maxsize=64)
+def _fetchSSMParam(paramName: str, decrypt: bool) -> str:
+    # failures raise and are therefore never cached
+    return ssm.get_parameter(Name=paramName, WithDecryption=decrypt)["Parameter"]["Value"]
+
+def getSSMParam(paramName: str, default: str = None, decrypt: bool = False):
+    try:
+        return _fetchSSMParam(paramName, decrypt)
+    except Exception as _e:
+        return default
\ No newline at end of file
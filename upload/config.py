@@ -1,5 +1,5 @@
 import logging
-from botoClients import ssm
+from botoClients import getSSMParam  # cached SSM lookups, re-exported as cfg.getSSMParam
 
 """
 ================= CONSTANTS =================
@@ -9,11 +9,16 @@ class HTTP:
     CREATED = 201
     BAD_REQUEST = 400
     NOT_FOUND = 404
+    PAYLOAD_TOO_LARGE = 413
     INTERNAL_ERROR = 500
 
 MAX_UPLOAD_SIZE = 5 * 1024 * 1024  # 5MB
-ALLOWED_KEYS = {"img", "label", "weight"}
-ALLOWED_LABELS = {"cat", "dog"}
+MAX_PART_HEADER_SIZE = 4 * 1024  # 4KB, per multipart section
+MAX_REQUEST_SIZE = MAX_UPLOAD_SIZE + 16 * 1024  # file + slack for the other fields/part headers
+CHUNK_UPDATE_ATTEMPTS = 3  # chunk selection retries on concurrent metadata changes
+SSM_FALLBACK_TTL = 60  # seconds an env fallback is reused before SSM is retried
+ALLOWED_KEYS = frozenset({"img", "label", "weight"})
+ALLOWED_LABELS = frozenset({"cat", "dog"})
 ALLOWED_MIMES = {
     "image/jpeg": "jpeg",
     "image/png": "png",
@@ -25,20 +30,4 @@ ALLOWED_MIMES = {
 """
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
-
-"""
-================= SSM Helpers =================
-"""
-
-_paramCache = {}
-def getSSMParam(paramName: str, default: str = None, decrypt: bool = False):
-    if paramName in _paramCache:
-        return _paramCache[paramName]
-    
-    try:
-        responseValue = ssm.get_parameter(Name=paramName, WithDecryption=decrypt)["Parameter"]["Value"]
-        _paramCache[paramName] = responseValue 
-        return responseValue
-    except Exception as _e:
-        return default
\ No newline at end of file
+logger.setLevel(logging.INFO)
\ No newline at end of file
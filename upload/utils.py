@@ -1,8 +1,81 @@
 import config as cfg
-from typing import Callable, Dict, Any, Union, List
-import json, re, time, os, imghdr
+from typing import Callable, Dict, Any, Union, List, Optional
+import json, re, time, os, functools, secrets, io
 from decimal import Decimal
-from botoClients import s3, dynamodb
+from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
+from botoClients import s3, dynamodb, dynamodbClient
+
+# fast JSON bodies when orjson is packaged, stdlib otherwise
+try:
+    import orjson
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str).decode("utf-8")
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, default=str)
+
+# multipart parsing constants, compiled once per container
+_NAME_RE = re.compile(br';\s*name="([^"]+)"')
+_FILENAME_RE = re.compile(br';\s*filename="([^"]+)"')
+_CTYPE_RE = re.compile(br"Content-Type:\s*([^\r\n]+)", re.IGNORECASE)
+_HEADER_SEP = b"\r\n\r\n"
+_INVALID_MULTIPART = {"error": "invalid multipart request"}
+_QUOTED_PAIR_RE = re.compile(r"\\(.)")
+
+# magic-number type -> MIME, for image validation
+_EXT_TO_MIME = {ext: mime for mime, ext in cfg.ALLOWED_MIMES.items()}
+# sorted once for error messages (lists keep the existing message format)
+_ALLOWED_MIMES_SORTED = sorted(cfg.ALLOWED_MIMES.keys())
+_ALLOWED_LABELS_SORTED = sorted(cfg.ALLOWED_LABELS)
+
+# background workers, reused across warm invocations
+_executor = ThreadPoolExecutor(max_workers=4)
+
+# label -> last chunk metadata seen (refreshed by every chunk-info write)
+_chunkMetadataCache: dict[str, dict[str, Any]] = {}
+
+# resource lookups: SSM values are cached per container (botoClients); an env fallback is only
+# reused for cfg.SSM_FALLBACK_TTL seconds, so a transient SSM failure during init is not pinned
+_CHUNK_INFO_TABLE_PARAM = ("/pet-api/production/dynamoDB/chunk-info-table-name", "fb_chunkInfoTableName")
+_CHUNKS_TABLE_PARAM = ("/pet-api/production/dynamoDB/image-chunks-table-name", "fb_chunkImageTableName")
+_UPLOAD_BUCKET_PARAM = ("/pet-api/production/s3/upload-bucket-name", "fb_S3BucketName")
+# (paramName, envName) -> (fallback value, resolved-at timestamp)
+_fallbackParams: dict[tuple[str, str], tuple[str, float]] = {}
+
+def _resolveParam(param: tuple[str, str]) -> str:
+    fallback = _fallbackParams.get(param)
+    if fallback and time.time() - fallback[1] < cfg.SSM_FALLBACK_TTL:
+        return fallback[0]
+
+    paramName, envName = param
+    value = cfg.getSSMParam(paramName)
+    if value:
+        _fallbackParams.pop(param, None)
+        return value
+
+    value = os.environ.get(envName)
+    if not value:
+        raise RuntimeError(f"'{paramName}' is unavailable from SSM and '{envName}' is not set")
+    _fallbackParams[param] = (value, time.time())
+    return value
+
+@functools.lru_cache(maxsize=None)
+def _tableFor(tableName: str) -> Any:
+    return dynamodb.Table(tableName)
+
+def _chunkInfoTable() -> Any:
+    return _tableFor(_resolveParam(_CHUNK_INFO_TABLE_PARAM))
+
+def _chunksTableName() -> str:
+    return _resolveParam(_CHUNKS_TABLE_PARAM)
+
+def _uploadBucketName() -> str:
+    return _resolveParam(_UPLOAD_BUCKET_PARAM)
+
+# pre-warm during init (lookups in parallel) so the first upload in a container skips the SSM round trips;
+# a missing value fails init right away with the RuntimeError above
+list(_executor.map(_resolveParam, (_CHUNK_INFO_TABLE_PARAM, _CHUNKS_TABLE_PARAM, _UPLOAD_BUCKET_PARAM)))
 
 def responder(statusCode: int, bodyMessage: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -23,9 +96,14 @@ def responder(statusCode: int, bodyMessage: Dict[str, Any]) -> Dict[str, Any]:
         "headers": {
             "Content-Type": "application/json"
         },
-        "body": json.dumps(bodyMessage)
+        "body": _dumps(bodyMessage)
     }
 
+# canonical error responses, serialized once (never mutated by callers)
+_BAD_REQUEST_RESPONSE = responder(400, {"error": "Bad request"})
+_INTERNAL_ERROR_RESPONSE = responder(500, {"error": "Internal server error"})
+INVALID_MULTIPART_RESPONSE = responder(400, {"error": "invalid multipart request"})
+
 def tryCatchHandler(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
     """
     A decorator to wrap Lambda handler functions with standardized exception handling.
@@ -52,13 +130,78 @@ def tryCatchHandler(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[s
         except ValueError as ve:
             # client-side errors
             cfg.logger.warning(f"ValueError: {ve}")
-            return responder(400, {"error": "Bad request"})
+            return _BAD_REQUEST_RESPONSE
         except Exception as ge:
             # internal error 
             cfg.logger.error(f"Unhandled Exception: {ge}", exc_info=True)
-            return responder(500, {"error": "Internal server error"})
+            return _INTERNAL_ERROR_RESPONSE
     return wrapper
 
+def _parseBoundary(contentType: str) -> Optional[str]:
+    """
+    Extracts the `boundary` parameter from a multipart/form-data Content-Type header (RFC 2046).
+
+    Handles quoted values (with backslash escapes), parameters in any order and
+    boundaries containing '='.
+
+    Args:
+        contentType (str): The raw Content-Type header value.
+
+    Returns:
+        Optional[str]: The boundary value, or None if the media type is not
+            multipart/form-data or no boundary parameter is present.
+    """
+    mediaType, *params = contentType.split(";")
+    if mediaType.strip().lower() != "multipart/form-data":
+        return None
+
+    for param in params:
+        key, _, value = param.strip().partition("=")
+        if key.strip().lower() != "boundary":
+            continue
+        value = value.strip()
+        if len(value) >= 2 and value.startswith('"') and value.endswith('"'):
+            value = _QUOTED_PAIR_RE.sub(r"\1", value[1:-1])
+        return value or None
+    return None
+
+@functools.lru_cache(maxsize=256)
+def _boundaryBytes(contentType: str) -> Optional[bytes]:
+    """
+    Returns the encoded part delimiter (b"--" + boundary) for a Content-Type header, or None.
+    Bounded cache so distinct (possibly malicious) header values cannot grow memory.
+    """
+    boundary = _parseBoundary(contentType=contentType)
+    if boundary is None:
+        return None
+    try:
+        return b"--" + boundary.encode("ascii")
+    except UnicodeEncodeError:
+        # RFC 2046 boundaries are 7-bit
+        return None
+
+def _iterPartBounds(body: bytes, delimiter: bytes):
+    """
+    Yields the (start, end) offsets of each `delimiter`-separated section of `body`, trimmed of
+    surrounding CR/LF characters. Equivalent to `[p.strip(b"\\r\\n") for p in body.split(delimiter)]`
+    without copying any section.
+    """
+    pos = 0
+    bodyLen = len(body)
+    while pos <= bodyLen:
+        nextIDX = body.find(delimiter, pos)
+        if nextIDX == -1:
+            nextIDX = bodyLen
+
+        start, end = pos, nextIDX
+        while start < end and body[start] in b"\r\n":
+            start += 1
+        while end > start and body[end - 1] in b"\r\n":
+            end -= 1
+        yield start, end
+
+        pos = nextIDX + len(delimiter)
+
 def bodyParser(requestBody: bytes, requestHeader: Dict[str, str]) -> Union[Dict[str, Any], Dict[str, str]]:
     """
     Parses a multipart/form-data HTTP request body and extracts fields and files.
@@ -75,70 +218,56 @@ def bodyParser(requestBody: bytes, requestHeader: Dict[str, str]) -> Union[Dict[
 
     Notes:
         - Supports standard text fields and file fields (with filename, content type, and binary data).
-        - Enforces a maximum file upload size defined by `cfg.MAX_UPLOAD_SIZE`.
+        - Enforces a maximum file upload size defined by `cfg.MAX_UPLOAD_SIZE` and a maximum
+          per-part header size defined by `cfg.MAX_PART_HEADER_SIZE`.
         - Case-insensitive parsing for headers and content type detection.
         - Ensures each multipart section includes a valid 'name' and optionally a 'filename' and 'Content-Type' header.
+        - File 'data' is a zero-copy `memoryview` into `requestBody`.
     """
     # case-insensitive header access
     contentType = requestHeader.get("Content-Type") or requestHeader.get("content-type")
     
-    if not contentType or "multipart/form-data" not in contentType:
-        return cfg.responder(cfg.HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
-    
-    # attempt to fetch boundary value
-    bdrIDX = contentType.find("boundary=")
-    if bdrIDX == -1:
-        return cfg.responder(cfg.HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
-    bdrValue = contentType.split("boundary=")[-1].strip()
-    bdrBytes = f"--{bdrValue}".encode()
-
-    # split the body by the boundary
-    bodyParts = requestBody.split(bdrBytes)
+    # attempt to fetch boundary delimiter (cached per Content-Type value)
+    bdrBytes = _boundaryBytes(contentType=contentType) if contentType else None
+    if not bdrBytes:
+        return _INVALID_MULTIPART
 
+    # walk the body boundary by boundary; parts are offsets/views into the original buffer (no copies)
+    bodyView = memoryview(requestBody)
     parsedBody = {}
 
-    for part in bodyParts:
-        # clean-up
-        part = part.strip(b"\r\n")
-        
-        if not part or part == b"--":
+    for partStart, partEnd in _iterPartBounds(body=requestBody, delimiter=bdrBytes):
+        if partStart == partEnd or (partEnd - partStart == 2 and requestBody.startswith(b"--", partStart)):
             continue
 
         # split the part into headers (part_header) & body (part_data)
-        if b"\r\n\r\n" not in part:
-            return cfg.responder(cfg.HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+        # headers must end within the first `cfg.MAX_PART_HEADER_SIZE` bytes of the part
+        headerEnd = requestBody.find(_HEADER_SEP, partStart, min(partEnd, partStart + cfg.MAX_PART_HEADER_SIZE + len(_HEADER_SEP)))
+        if headerEnd == -1:
+            return _INVALID_MULTIPART
         
-        part_header, part_data = part.split(b"\r\n\r\n", 1)
+        part_header = requestBody[partStart:headerEnd]
+        part_data = bodyView[headerEnd + len(_HEADER_SEP):partEnd]
 
         # extract and safely decode common 'name' field from the header
-        nameFieldMatch = re.search(br';\s*name="([^"]+)"', part_header)
+        nameFieldMatch = _NAME_RE.search(part_header)
         if not nameFieldMatch:
-            return cfg.responder(cfg.HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+            return _INVALID_MULTIPART
 
         nameFieldMatch = nameFieldMatch.group(1).decode("utf-8", errors="ignore")
 
         # check if it's a file or regular part 
-        if b"filename=" in part:
+        if b"filename=" in part_header:
             # file size check
             if len(part_data) > cfg.MAX_UPLOAD_SIZE:
                 return {"error": f"file size exceeds limit for field '{nameFieldMatch}'"}
 
-            filenameFieldMatch = re.search(br';\s*filename="([^"]+)"', part_header)
-            contentTypeFieldMatch = re.search(br"Content-Type:\s*([^\r\n]+)", part_header)
+            filenameFieldMatch = _FILENAME_RE.search(part_header)
+            contentTypeFieldMatch = _CTYPE_RE.search(part_header)
 
             # skip if the part if no filename or content field is found
             if not filenameFieldMatch or not contentTypeFieldMatch:
-                return cfg.responder(cfg.HTTP.BAD_REQUEST, {
-            "error": "invalid multipart request"
-        })
+                return _INVALID_MULTIPART
 
             parsedBody[nameFieldMatch] = {
                 "type": "file",
@@ -149,11 +278,30 @@ def bodyParser(requestBody: bytes, requestHeader: Dict[str, str]) -> Union[Dict[
         else:
             parsedBody[nameFieldMatch] = {
                 "type": "field",
-                "value": part_data.decode("utf-8", errors="ignore") 
+                "value": str(part_data, "utf-8", "ignore")
             }
     
     return parsedBody
 
+def _sniffImageType(data: bytes) -> Optional[str]:
+    """
+    Detects the image type of the allowed formats from its magic bytes.
+
+    Args:
+        data (bytes): The image payload (bytes or memoryview); only the first 12 bytes are read.
+
+    Returns:
+        Optional[str]: "jpeg", "png" or "webp" (matching `cfg.ALLOWED_MIMES` values), or None.
+    """
+    header = bytes(data[:12])
+    if header[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if header[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    return None
+
 def bodyValidator(req_body: Dict[str, Any]) -> Union[bool, Dict[str, Any]]:
     """
     Validates the structure and content of a multipart HTTP request body.
@@ -169,7 +317,8 @@ def bodyValidator(req_body: Dict[str, Any]) -> Union[bool, Dict[str, Any]]:
             - A response dictionary with status code and error message if validation fails.
 
     Notes:
-        - 'img' must be a valid image file of type JPEG, PNG, or WEBP.
+        - 'img' must be a valid image file of type JPEG, PNG, or WEBP, verified by its magic bytes;
+          its 'contentType' is replaced with the detected MIME type.
         - 'label' must be a string field and one of the allowed labels (e.g., "cat", "dog").
         - 'weight' is optional but must be a float strictly between 0.0 and 1.0 if provided.
     """
@@ -187,23 +336,12 @@ def bodyValidator(req_body: Dict[str, Any]) -> Union[bool, Dict[str, Any]]:
     if not img or img.get("type") != "file":
         return responder(cfg.HTTP.BAD_REQUEST, {"error": "'img' must be a valid file"})
     
+    # always verify the magic number and trust it over the declared Content-Type (prevents spoofed payloads)
     imgData = img.get("data")
-    imgMIME = img.get("contentType", "").lower()
-    expectedType = cfg.ALLOWED_MIMES.get(imgMIME)
-    
-    if not expectedType:
-        magicType = imghdr.what(None, h=imgData)
-
-        for mime, ext in cfg.ALLOWED_MIMES.items():
-            if ext == magicType:
-                imgMIME = mime
-                expectedType = magicType
-                break
-        else:
-            expectedType = None
-
-    if not imgData or not expectedType:
-        return responder(cfg.HTTP.BAD_REQUEST, {"error": f"'img' must be {sorted(cfg.ALLOWED_MIMES.keys())}"})
+    magicMIME = _EXT_TO_MIME.get(_sniffImageType(data=imgData)) if imgData else None
+    if not magicMIME:
+        return responder(cfg.HTTP.BAD_REQUEST, {"error": f"'img' must be {_ALLOWED_MIMES_SORTED}"})
+    img["contentType"] = magicMIME
 
     # --- label ---
     if not label or label.get("type") != "field":
@@ -212,7 +350,7 @@ def bodyValidator(req_body: Dict[str, Any]) -> Union[bool, Dict[str, Any]]:
     labelValue = label["value"].strip().lower()
     if labelValue not in cfg.ALLOWED_LABELS:
         return responder(cfg.HTTP.BAD_REQUEST, {
-            "error": f"'label' must be one of {sorted(cfg.ALLOWED_LABELS)}"
+            "error": f"'label' must be one of {_ALLOWED_LABELS_SORTED}"
         })
 
     # --- weight (optional) ---
@@ -227,12 +365,16 @@ def bodyValidator(req_body: Dict[str, Any]) -> Union[bool, Dict[str, Any]]:
     
     return True
     
-def getChunksInfo(label: str) -> dict[str, Union[str, List[int], int]]:
+def getChunksInfo(label: str, consistentRead: bool = False) -> dict[str, Union[str, List[int], int]]:
     """
     Retrieves metadata for a given label from the DynamoDB chunk info table.
 
+    Only the chunk management attributes are projected. Reads are eventually consistent
+    (half the read capacity) unless `consistentRead` is set, e.g. after a conditional-write conflict.
+
     Args:
         label (str): The label associated with the image category (e.g., "cat", "dog").
+        consistentRead (bool): Whether to issue a strongly consistent read. Defaults to False.
 
     Returns:
         dict[str, Union[str, List[int], int]]: A dictionary containing chunk metadata,
@@ -242,35 +384,75 @@ def getChunksInfo(label: str) -> dict[str, Union[str, List[int], int]]:
         RuntimeError: If the data cannot be retrieved from DynamoDB.
 
     Notes:
-        - The table name is retrieved from AWS SSM using a predefined parameter.
+        - The table name is retrieved from AWS SSM using a predefined parameter (once per container).
         - Assumes the item with the given label exists in the table, i.e. precondition of label creation
     """
-    infoTableName = cfg.getSSMParam("/pet-api/production/dynamoDB/chunk-info-table-name", default=os.environ.get("fb_chunkInfoTableName"))
-    infoTable = dynamodb.Table(infoTableName)
+    infoTable = _chunkInfoTable()
 
     try:
-        dynamoResponse = infoTable.get_item(Key={"label": label})
-        return dynamoResponse["Item"]
+        dynamoResponse = infoTable.get_item(
+            Key={"label": label},
+            ProjectionExpression="chunkMax, chunkThreshold, chunksNumber, chunkVolume, activeChunks",
+            ConsistentRead=consistentRead
+        )
+        chunkMetadata = dynamoResponse["Item"]
     except Exception as _e:
         raise RuntimeError("Failed to retrive data from DynamoDB")
 
-def selectAndModifyChunk(chunkMetadata: dict[str, Union[str, List[Decimal]]], label: str) -> None:
+    _chunkMetadataCache[label] = chunkMetadata
+    return chunkMetadata
+
+def _isConditionFailure(error: Exception) -> bool:
     """
-    Selects an appropriate chunk for the new image entry based on current volume thresholds,
-    and updates the chunk metadata in DynamoDB accordingly.
+    Returns True if `error` is DynamoDB's ConditionalCheckFailedException.
+    """
+    return isinstance(error, ClientError) and error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
 
-    If a reusable chunk (not exceeding `chunkMax` or `chunkThreshold`) exists, it is updated
-    with incremented volume. If no such chunk exists, a new chunk is created and appended
-    to the metadata structure (`chunkVolume`, `activeChunks`, `chunksNumber`).
+def _retireChunk(label: str, chunkId: int, chunkMetadata: dict[str, Any]) -> None:
+    """
+    Removes a full chunk from `activeChunks`. Best-effort: the position is guarded by a condition,
+    so a concurrent retirement/shift makes this a no-op instead of removing the wrong entry.
+    """
+    # single pass over the fresh list (positions may have shifted since selection)
+    position = next((pos for pos, rawIdx in enumerate(chunkMetadata["activeChunks"]) if int(rawIdx) == chunkId), None)
+    if position is None:
+        return
+
+    try:
+        response = _chunkInfoTable().update_item(
+            Key={"label": label},
+            UpdateExpression=f"REMOVE activeChunks[{position}]",
+            ConditionExpression=f"activeChunks[{position}] = :chunkId",
+            ExpressionAttributeValues={":chunkId": Decimal(chunkId)},
+            ReturnValues="ALL_NEW"
+        )
+        _chunkMetadataCache[label] = response["Attributes"]
+    except Exception as e:
+        if not _isConditionFailure(e):
+            cfg.logger.warning(f"Failed to retire chunk {chunkId} for label '{label}': {e}")
+
+def selectAndModifyChunk(label: str, chunkMetadata: Optional[dict[str, Union[str, List[Decimal]]]] = None) -> int:
+    """
+    Selects an appropriate chunk for the new image entry and atomically reserves a slot in it.
+
+    Each active chunk is tried with a conditional in-place increment (`chunkVolume[idx] < chunkMax`),
+    so concurrent uploads are serialized by DynamoDB instead of racing on a read-modify-write.
+    A chunk that reaches `chunkMax` is then removed from `activeChunks`. If no active chunk has room,
+    a new chunk is appended, conditioned on `chunksNumber` being unchanged so concurrent creators
+    cannot double-append; on conflict the metadata is re-read and selection is retried.
+
+    The metadata returned by every successful write is cached per container, so the hot path needs
+    no separate read (`getChunksInfo` is only called on a cold container or after a conflict).
 
     Args:
-        chunkMetadata (dict): Dictionary containing chunk management fields from DynamoDB:
+        label (str): The image label (e.g., "cat", "dog") used as the primary key in the table.
+        chunkMetadata (dict, optional): Dictionary containing chunk management fields from DynamoDB:
             - 'chunkMax': Maximum capacity per chunk.
             - 'chunkThreshold': Soft threshold to prefer reusing existing chunks.
             - 'chunksNumber': Total number of chunks so far.
             - 'chunkVolume': List representing volume of each chunk.
             - 'activeChunks': List of indices of chunks currently accepting entries.
-        label (str): The image label (e.g., "cat", "dog") used as the primary key in the table.
+            Defaults to the per-container cached metadata.
 
     Returns:
         int: The ID (index) of the chunk selected or created for storing the image entry.
@@ -278,61 +460,117 @@ def selectAndModifyChunk(chunkMetadata: dict[str, Union[str, List[Decimal]]], la
     Raises:
         RuntimeError: If the DynamoDB update operation fails during selection or creation.
     """
-    chunkMax = int(chunkMetadata["chunkMax"])
-    chunksNumber = int(chunkMetadata["chunksNumber"])
-    chunkThreshold = int(chunkMetadata["chunkThreshold"])
-    chunkVolume = chunkMetadata["chunkVolume"]
-    activeChunks = chunkMetadata["activeChunks"]
+    if chunkMetadata is None:
+        chunkMetadata = _chunkMetadataCache.get(label) or getChunksInfo(label=label)
 
+    infoTable = _chunkInfoTable()
 
-    infoTableName = cfg.getSSMParam("/pet-api/production/dynamoDB/chunk-info-table-name", default=os.environ.get("fb_chunkInfoTableName"))
-    infoTable = dynamodb.Table(infoTableName)
-    
-    # find reusable chunk
-    for idx in activeChunks:
-        idx = int(idx)
-        volume = int(chunkVolume[idx])
-        if volume <= chunkThreshold or volume <= chunkMax :
-            newVolume = volume + 1
-        
-            removeFromActive = newVolume >= chunkMax
-            updateExpr = f"SET chunkVolume[{idx}] = :newVolume"
-            exprValues = {":newVolume": Decimal(newVolume)}
+    for _attempt in range(cfg.CHUNK_UPDATE_ATTEMPTS):
+        chunkMax = int(chunkMetadata["chunkMax"])
+        chunksNumber = int(chunkMetadata["chunksNumber"])
+        chunkVolume = chunkMetadata["chunkVolume"]
+        activeChunks = chunkMetadata["activeChunks"]
 
-            if removeFromActive:
-                updateExpr += f" REMOVE activeChunks[{activeChunks.index(idx)}]"
+        # find reusable chunk
+        for idx in activeChunks:
+            idx = int(idx)
+            # known full (possibly not yet retired), skip without a request
+            if int(chunkVolume[idx]) >= chunkMax:
+                continue
 
             try:
-                infoTable.update_item(
+                response = infoTable.update_item(
                     Key={"label": label},
-                    UpdateExpression=updateExpr,
-                    ExpressionAttributeValues=exprValues
+                    UpdateExpression=f"SET chunkVolume[{idx}] = chunkVolume[{idx}] + :one",
+                    ConditionExpression=f"chunkVolume[{idx}] < :chunkMax",
+                    ExpressionAttributeValues={":one": Decimal(1), ":chunkMax": Decimal(chunkMax)},
+                    ReturnValues="ALL_NEW"
                 )
             except Exception as e:
-                    raise RuntimeError("Failed to update data within DynamoDB")
-
+                if _isConditionFailure(e):
+                    # filled up concurrently, try the next one
+                    continue
+                raise RuntimeError("Failed to update data within DynamoDB")
+
+            updatedMetadata = response["Attributes"]
+            _chunkMetadataCache[label] = updatedMetadata
+            if int(updatedMetadata["chunkVolume"][idx]) >= chunkMax:
+                _retireChunk(label=label, chunkId=idx, chunkMetadata=updatedMetadata)
             return idx
-    
-    # no reusable chunk, create new one
+
+        # no reusable chunk, create new one
+        try:
+            response = infoTable.update_item(
+                Key={"label": label},
+                UpdateExpression="""
+                    SET chunksNumber = :nextChunk,
+                        chunkVolume = list_append(chunkVolume, :zeroList),
+                        activeChunks = list_append(activeChunks, :newChunk)
+                """,
+                ConditionExpression="chunksNumber = :currentChunks",
+                ExpressionAttributeValues={
+                    ":currentChunks": Decimal(chunksNumber),
+                    ":nextChunk": Decimal(chunksNumber + 1),
+                    ":zeroList": [Decimal(1)],
+                    ":newChunk": [Decimal(chunksNumber)]
+                },
+                ReturnValues="ALL_NEW"
+            )
+        except Exception as e:
+            if _isConditionFailure(e):
+                # metadata changed concurrently (or cache was stale), re-read the latest state and retry
+                chunkMetadata = getChunksInfo(label=label, consistentRead=True)
+                continue
+            raise RuntimeError("Failed to update data within DynamoDB")
+
+        _chunkMetadataCache[label] = response["Attributes"]
+        return chunksNumber
+
+    raise RuntimeError("Failed to update data within DynamoDB")
+
+
+def releaseChunkSlot(label: str, chunkId: int) -> None:
+    """
+    Gives back a slot reserved by `selectAndModifyChunk` when the image entry could not be written.
+
+    The decrement is guarded on a positive volume, so a double release cannot drive it negative.
+    Chunks are never removed (readers rely on `chunksNumber` only growing), so a chunk created for
+    the reservation stays in place, empty and active, until the next upload fills it; a chunk that
+    was retired when the reservation filled it is put back into `activeChunks` the same way.
+    Best-effort: failures are logged, never raised.
+
+    Args:
+        label (str): The image label used as the primary key in the table.
+        chunkId (int): The chunk index returned by `selectAndModifyChunk`.
+    """
+    infoTable = _chunkInfoTable()
+
     try:
-        infoTable.update_item(
+        response = infoTable.update_item(
             Key={"label": label},
-            UpdateExpression="""
-                SET chunksNumber = :nextChunk,
-                    chunkVolume = list_append(chunkVolume, :zeroList),
-                    activeChunks = list_append(activeChunks, :newChunk)
-            """,
-            ExpressionAttributeValues={
-                ":nextChunk": Decimal(chunksNumber + 1),
-                ":zeroList": [Decimal(1)],
-                ":newChunk": [Decimal(chunksNumber)]
-            }
+            UpdateExpression=f"SET chunkVolume[{chunkId}] = chunkVolume[{chunkId}] - :one",
+            ConditionExpression=f"chunkVolume[{chunkId}] > :zero",
+            ExpressionAttributeValues={":one": Decimal(1), ":zero": Decimal(0)},
+            ReturnValues="ALL_NEW"
         )
-    except Exception as e:
-        raise RuntimeError("Failed to update data within DynamoDB")
+        chunkMetadata = response["Attributes"]
+        _chunkMetadataCache[label] = chunkMetadata
 
-    return chunksNumber
+        if any(int(rawIdx) == chunkId for rawIdx in chunkMetadata["activeChunks"]):
+            return
 
+        # reactivate a chunk retired by this reservation (unless a concurrent release already did)
+        response = infoTable.update_item(
+            Key={"label": label},
+            UpdateExpression="SET activeChunks = list_append(activeChunks, :chunkIdList)",
+            ConditionExpression="NOT contains(activeChunks, :chunkId)",
+            ExpressionAttributeValues={":chunkIdList": [Decimal(chunkId)], ":chunkId": Decimal(chunkId)},
+            ReturnValues="ALL_NEW"
+        )
+        _chunkMetadataCache[label] = response["Attributes"]
+    except Exception as e:
+        if not _isConditionFailure(e):
+            cfg.logger.warning(f"Failed to release slot in chunk {chunkId} for label '{label}': {e}")
 
 def appendToChunkFile(label: str, chunkId: int, newEntry: dict) -> None:
     """
@@ -347,64 +585,95 @@ def appendToChunkFile(label: str, chunkId: int, newEntry: dict) -> None:
         chunkId (int): The chunk index where the image metadata should be stored.
         newEntry (dict): Dictionary containing:
             - 's3key': The S3 key/path of the uploaded image.
-            - 'weight': The selection weight for this image (float between 0.0 and 1.0).
+            - 'weight': The selection weight for this image (Decimal/float between 0.0 and 1.0).
 
     Raises:
         RuntimeError: If the DynamoDB `put_item` operation fails.
     """
-    chunksTableName = cfg.getSSMParam("/pet-api/production/dynamoDB/image-chunks-table-name", default=os.environ.get("fb_chunkImageTableName"))
-    chunksTable = dynamodb.Table(chunksTableName)
+    # low-level client with a hand-built AttributeValue item, skips the resource serializer
     try:
-        item = {
-            "label": label,
-            "chunkNumber": chunkId,
-            "s3key": newEntry["s3key"],
-            "weight": newEntry["weight"] 
-        }
-        
-        chunksTable.put_item(Item=item)
+        dynamodbClient.put_item(
+            TableName=_chunksTableName(),
+            Item={
+                "label": {"S": label},
+                "chunkNumber": {"N": str(chunkId)},
+                "s3key": {"S": newEntry["s3key"]},
+                "weight": {"N": str(newEntry["weight"])}
+            }
+        )
     except Exception as _e:
         raise RuntimeError("Failed to insert into DynamoDB")
 
-def _append_timestamp(filename: str) -> str:
+def _makeKey(label: str, filename: str) -> str:
     """
-    Appends a UNIX timestamp to the base name of the given filename.
+    Builds a collision-resistant S3 object key for an uploaded file.
+
+    A nanosecond timestamp plus a short random suffix is appended to the base name, so burst
+    uploads of the same filename never overwrite each other.
 
     Args:
+        label (str): The image label, used as the key prefix.
         filename (str): The original filename (e.g., "image.jpg").
 
     Returns:
-        str: The filename with a timestamp appended before the extension
-             (e.g., "image_1721382021.jpg").
+        str: The object key (e.g., "cat/image_17e3a1c9b2f04d21_a1b2c3.jpg").
+    """
+    extIDX = filename.rfind(".")
+    name, ext = (filename[:extIDX], filename[extIDX:]) if extIDX > 0 else (filename, "")
+    return f"{label}/{name}_{time.time_ns():x}_{secrets.token_hex(3)}{ext}"
+
+class _BufferReader(io.RawIOBase):
     """
-    name, ext = os.path.splitext(filename) 
-    timestamp = int(time.time()) 
-    return f"{name}_{timestamp}{ext}"
+    Read-only, seekable file-like object over a bytes-like buffer (e.g. the parser's memoryview).
+
+    Lets botocore stream the request body (and rewind it for checksums/retries) without first
+    materializing the payload as a separate `bytes` copy.
+    """
+    def __init__(self, buffer: Any) -> None:
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        size = min(len(b), len(self._view) - self._pos)
+        b[:size] = self._view[self._pos:self._pos + size]
+        self._pos += size
+        return size
 
-def s3Upload(fileDict: Dict[str, str], label: str) -> Union[str, None]:
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+def s3Upload(fileDict: Dict[str, str], key: str) -> Union[str, None]:
     """
     Uploads an image to the appropriate S3 bucket and returns its public URL.
 
     Args:
         fileDict (Dict[str, str]): A dictionary containing file information:
-            - 'filename': Original file name (used for naming in S3)
-            - 'data': Binary content of the file
+            - 'data': Binary content of the file (bytes or memoryview)
             - 'contentType': MIME type of the file (e.g., "image/png")
-        label (str): The image label ("cat", "dog", etc.), used as the prefix in the S3 key.
+        key (str): The object key to store the image under (see `_makeKey`).
 
     Returns:
         Union[str, None]: The public URL of the uploaded image in the S3 bucket,
                           or None if the upload fails.
     """
     try:
-        newFilename = _append_timestamp(fileDict.get("filename"))
-        key = f'{label}/{newFilename}'
-        s3BucketName = cfg.getSSMParam("/pet-api/production/s3/upload-bucket-name", default=os.environ.get("fb_S3BucketName"))
+        s3BucketName = _uploadBucketName()
 
         s3.put_object(
             Bucket=s3BucketName,
             Key=key,
-            Body=fileDict.get("data"),
+            Body=_BufferReader(fileDict.get("data")),
             ContentType=fileDict.get("contentType")
         )
 
@@ -425,8 +694,64 @@ def s3Delete(s3Key: str) -> bool:
         bool: True if deletion succeeds, False otherwise.
     """
     try:
-        s3BucketName = cfg.getSSMParam("/pet-api/production/s3/upload-bucket-name", default=os.environ.get("fb_S3BucketName"))
+        s3BucketName = _uploadBucketName()
         s3.delete_object(Bucket=s3BucketName, Key=s3Key)
         return True
     except Exception as _e:
-        return False
\ No newline at end of file
+        return False
+
+def uploadAndIndex(fileDict: Dict[str, str], label: str, weight: Decimal) -> Union[str, None]:
+    """
+    Uploads an image to S3 and registers it in a chunk, overlapping the independent network calls.
+
+    The S3 upload runs on a background worker while a chunk slot is reserved in DynamoDB, so the
+    critical path is `max(t_s3, t_select) + t_append` instead of the sum of all three. The chunk
+    entry itself is only written once the object exists, so readers never select a missing image.
+    If the upload fails the reserved slot is released again; if indexing fails the slot is released
+    and the uploaded object is removed.
+
+    Args:
+        fileDict (Dict[str, str]): The parsed 'img' file dictionary ('filename', 'data', 'contentType').
+        label (str): The image label ("cat", "dog", etc.).
+        weight (Decimal): The selection weight for the image.
+
+    Returns:
+        Union[str, None]: The public URL of the uploaded image, or None if upload or indexing failed.
+    """
+    key = _makeKey(label=label, filename=fileDict.get("filename"))
+    uploadFuture = _executor.submit(s3Upload, fileDict=fileDict, key=key)
+
+    try:
+        # atomically reserve a slot in a chunk (chunk info is cached per container)
+        selectedChunkID = selectAndModifyChunk(label=label)
+    except Exception as e:
+        cfg.logger.error(f"Chunk selection failed: {e}")
+        selectedChunkID = None
+
+    s3Url = uploadFuture.result()
+    if not s3Url:
+        # upload failed, give back the slot reserved for it
+        if selectedChunkID is not None:
+            releaseChunkSlot(label=label, chunkId=selectedChunkID)
+        return None
+
+    if selectedChunkID is None:
+        s3Delete(s3Key=key)
+        return None
+
+    try:
+        appendToChunkFile(
+            label=label,
+            chunkId=selectedChunkID,
+            newEntry={
+                "s3key": s3Url,
+                "weight": weight
+            }
+        )
+    except Exception as _e:
+        # metadata insertion failed, give the slot back and delete uploaded image from S3
+        releaseChunkSlot(label=label, chunkId=selectedChunkID)
+        s3Delete(s3Key=key)
+        return None
+
+    return s3Url
\ No newline at end of file